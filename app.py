@@ -1,10 +1,14 @@
 import pandas as pd
 import streamlit as st
-from shapely import wkt
-import geopandas as gpd
 from datetime import datetime, timedelta
 import folium
-from streamlit_folium import st_folium
+from loaders import read_noise_map, read_concert_plan, read_construction_plan, read_raw_construction_plan
+from dissolve import refresh_dissolved
+from rollups import refresh_rollups, ROLLUP_LEVELS
+from timeline import activity_deltas, timeline_payload, TimelineLayer
+from venues import VenueIndex
+from transport import COORD_PRECISION, quantize, to_topojson
+from live_map import layer_payload, live_map
 st.session_state.update(st.session_state)
 THEME_COLOR = {
     'primary': '#6C9BCF',
@@ -26,51 +30,37 @@ st.markdown(f"""
 # Data loading with correct column names
 @st.cache_data
 def load_noise_data():
-    noise_df = pd.read_csv('data/cleaned/noise_map.csv')
-    noise_df = noise_df.rename(columns={
-        'Day/Night period': 'period',
-        'Type': 'source_type'
-    })
-    noise_df['period'] = noise_df['period'].str.lower()
-    noise_df['geometry'] = noise_df['WKT_LNG_LAT'].apply(wkt.loads)
-    return gpd.GeoDataFrame(noise_df, geometry='geometry').set_crs(epsg=4326)
+    return read_noise_map()
+
+@st.cache_data
+def load_dissolved_noise_data():
+    # One multipolygon per (source, period, level), rebuilt only when noise_map.csv changes
+    return refresh_dissolved()
 
 @st.cache_data
 def load_concert_data():
-    try:
-        concert_df = pd.read_csv('data/cleaned/concert_plan.csv', encoding='utf-8')
-    except UnicodeDecodeError:
-        concert_df = pd.read_csv('data/cleaned/concert_plan.csv', encoding='latin1')
-    concert_df.replace('Unknown', pd.NA, inplace=True)
-    concert_df['Date'] = pd.to_datetime(concert_df['Date'])
-    concert_df[['Latitude', 'Longitude']] = concert_df[['Latitude', 'Longitude']].apply(pd.to_numeric, errors='coerce')
-    return concert_df.dropna(subset=['Latitude', 'Longitude'])
+    return read_concert_plan()
 
 @st.cache_data
 def load_construction_data():
-    # Load data with proper coordinate system handling
-    construction_df = pd.read_csv('data/cleaned/construction_plan.csv')
-    
-    # Convert WKT to geometry with original CRS
-    construction_df['Geometry'] = construction_df['Geometry'].apply(wkt.loads)
-    construction_gdf = gpd.GeoDataFrame(
-        construction_df,
-        geometry='Geometry',
-        crs="EPSG:28992"  # Set original CRS first
-    )
-    
-    # Transform to WGS84 (EPSG:4326)
-    construction_gdf = construction_gdf.to_crs(epsg=4326)
-    
-    # Calculate centroids AFTER transformation
-    construction_gdf['center'] = construction_gdf['Geometry'].centroid
-    
-    # Parse dates
-    construction_gdf['Planned_Construction_Start'] = pd.to_datetime(
-        construction_gdf['Planned_Construction_Start']
-    )
-    
-    return construction_gdf
+    return read_construction_plan()
+
+@st.cache_resource
+def load_venue_index():
+    # Deduplicated venues with sorted event dates, built once and shared read-only
+    return VenueIndex(load_concert_data())
+
+@st.cache_data
+def load_timeline(start_date, end_date, kinds):
+    # Delta lists are computed once per range; stepping through days happens in the browser
+    construction_gdf, concert_df = load_construction_data(), load_concert_data()
+    deltas = activity_deltas(construction_gdf, concert_df, start_date, end_date)
+    return timeline_payload(construction_gdf, concert_df, deltas, start_date, end_date, kinds)
+
+@st.cache_data
+def load_rollups(_dissolved_gdf):
+    # Materialized under data/cleaned/rollups, only changed projects are re-overlaid
+    return refresh_rollups(_dissolved_gdf, read_raw_construction_plan())
 
 # Load data
 noise_gdf = load_noise_data()
@@ -143,85 +133,131 @@ with st.sidebar:
         options=noise_gdf['source_type'].unique(),
         default=DEFAULT_SOURCE
     )
+    per_feature_tooltips = st.checkbox(
+        "Per-feature tooltips",
+        value=False,
+        help="Draw every noise polygon separately instead of the dissolved zones (slower)"
+    )
 
     st.markdown("---")
-    concert_date = st.date_input(
-        "📅 Date",
-        value=datetime.today().date()
-    )
+    timeline_mode = st.checkbox("🎞️ Timeline Mode", value=False, key="timeline_mode")
+    if timeline_mode:
+        timeline_range = st.date_input(
+            "📅 Date Range",
+            value=(datetime.today().date(), datetime.today().date() + timedelta(days=30))
+        )
+        # Keep showing the single-day view until both ends of the range are picked
+        concert_date = timeline_range[0]
+        timeline_mode = len(timeline_range) == 2
+    else:
+        concert_date = st.date_input(
+            "📅 Date",
+            value=datetime.today().date()
+        )
     
     st.markdown("---")
     show_concerts = st.checkbox("🎤 Show Concerts", value=True, key="show_concerts")
     show_constructions = st.checkbox("🚧 Show Constructions", value=True, key="show_constructions")
+    show_rollups = st.checkbox("📊 Neighbourhood Stats", value=False, key="show_rollups")
+    if show_rollups:
+        rollup_level = st.radio(
+            "rollup_level",
+            options=list(ROLLUP_LEVELS),
+            format_func=str.capitalize,
+            horizontal=True,
+            label_visibility="collapsed"
+        )
 
 # Data filtering
-noise_filter = noise_gdf[
-    (noise_gdf['source_type'].isin(noise_sources)) &
-    (noise_gdf['period'] == time_mode) &
-    (noise_gdf['legend'].isin(selected_levels))
+noise_layers = noise_gdf if per_feature_tooltips else load_dissolved_noise_data()
+noise_filter = noise_layers[
+    (noise_layers['source_type'].isin(noise_sources)) &
+    (noise_layers['period'] == time_mode) &
+    (noise_layers['legend'].isin(selected_levels))
 ]
 
-concert_filter = concert_df[concert_df['Date'].dt.date == concert_date]
+def noise_style(level):
+    # Direct index mapping for both modes
+    if time_mode == "day":
+        color_index = level - 1  # Maps 1-6 to 0-5
+    else:
+        color_index = (level - 11)  # Maps 11-16 to 0-5
 
-# Map creation
-m = folium.Map(
-    location=(52.3676, 4.9041),  # Fixed initial position
-    zoom_start=12,               # Fixed initial zoom
-    tiles='CartoDB positron',
-    control_scale=True,
-    prefer_canvas=True,
-    zoom_control=False
-)
+    color_scheme = THEME_COLOR['day_colors'] if time_mode == "day" else THEME_COLOR['night_colors']
+    border_color = "#FFA000" if time_mode == "day" else "#00796B"
 
-if not noise_filter.empty:
-    for _, row in noise_filter.iterrows():
-        level = row['legend']
-        
-        # Direct index mapping for both modes
-        if time_mode == "day":
-            color_index = level - 1  # Maps 1-6 to 0-5
-        else:
-            color_index = (level - 11)  # Maps 11-16 to 0-5
-
-        color_scheme = THEME_COLOR['day_colors'] if time_mode == "day" else THEME_COLOR['night_colors']
-        border_color = "#FFA000" if time_mode == "day" else "#00796B"
-        
-        if 0 <= color_index < len(color_scheme):
-            # Force capture current values in lambda
-            folium.GeoJson(
-                row['geometry'],
-                style_function=lambda x, fill=color_scheme[color_index], 
-                                      border=border_color: {
-                    'fillColor': fill,
-                    'color': border,
-                    'weight': 1.5,
-                    'fillOpacity': 0.5
-                },
-                tooltip=f"Source: {row['source_type']}<br>Level: {NOISE_LEVEL_MAPPING.get(level, 'N/A')}"
-            ).add_to(m)
+    if 0 <= color_index < len(color_scheme):
+        return {
+            'fillColor': color_scheme[color_index],
+            'color': border_color,
+            'weight': 1.5,
+            'fillOpacity': 0.5
+        }
+    return None
+
+def build_noise_layer(layer_gdf, level):
+    fg = folium.FeatureGroup(name=f"noise_{level}")
+    style = noise_style(level)
+    if style is None:
+        return fg
+    for _, row in layer_gdf.iterrows():
+        folium.GeoJson(
+            quantize(row['geometry']),
+            style_function=lambda x, style=style: style,
+            tooltip=f"Source: {row['source_type']}<br>Level: {NOISE_LEVEL_MAPPING.get(level, 'N/A')}"
+        ).add_to(fg)
+    return fg
+
+def build_noise_topology_layer(layer_gdf, source_type, level):
+    # One source and level as TopoJSON: delta-encoded integer arcs instead of
+    # GeoJSON coordinates. One layer per level, so toggling a level sends only that level
+    fg = folium.FeatureGroup(name=f"noise_{source_type}_{level}")
+    style = noise_style(level)
+    if style is None:
+        return fg
+    label = f"Source: {source_type}<br>Level: {NOISE_LEVEL_MAPPING.get(level, 'N/A')}"
+    topology = to_topojson(list(layer_gdf.geometry), [{'label': label}] * len(layer_gdf))
+    folium.TopoJson(
+        topology,
+        object_path='objects.noise',
+        style_function=lambda x, style=style: style,
+        tooltip=folium.GeoJsonTooltip(fields=['label'], labels=False)
+    ).add_to(fg)
+    return fg
 
 # Modified concert markers with purple circles
 PURPLE_COLOR = '#9C27B0'  # Purple color matching the icon
-if show_concerts:
-    for _, event in concert_filter.iterrows():
+
+def build_concert_layer():
+    # One marker per venue per day, listing every event at that venue
+    fg = folium.FeatureGroup(name="concerts")
+    venue_index = load_venue_index()
+    for venue_id, rows in venue_index.events_on(concert_date).items():
+        venue = venue_index.venues.loc[venue_id]
+        events = concert_df.loc[rows]
+        artists = "<br>".join(f"<b>{artist}</b>" for artist in events['Artist'])
+        upcoming = venue_index.event_nights(venue_id, concert_date, days=30)
         folium.Marker(
-            location=[event['Latitude'], event['Longitude']],
-            popup=f"""<b>{event['Artist']}</b><br>
-                    {event['Venue']}<br>
-                    {event['Date'].strftime('%Y-%m-%d')}""",
+            location=[venue['Latitude'], venue['Longitude']],
+            popup=f"""{artists}<br>
+                    {venue['Venue']}<br>
+                    {pd.Timestamp(concert_date).strftime('%Y-%m-%d')}<br>
+                    {upcoming} event nights in the next 30 days""",
+            tooltip=f"{venue['Venue']}: {len(events)} concert{'s' if len(events) > 1 else ''}",
             icon=folium.Icon(color='purple', icon='music', prefix='fa')
-        ).add_to(m)
+        ).add_to(fg)
         
         # Add 50m radius circle[2,3](@ref)
         folium.Circle(
-            location=[event['Latitude'], event['Longitude']],
+            location=[venue['Latitude'], venue['Longitude']],
             radius=50,
             color=PURPLE_COLOR,
             fill=True,
             fill_color=PURPLE_COLOR,
             fill_opacity=0.2,
             weight=2
-        ).add_to(m)
+        ).add_to(fg)
+    return fg
 
 CONSTRUCTION_COLOR = {
     'fill': '#8B4513',  # 深棕色填充
@@ -229,7 +265,8 @@ CONSTRUCTION_COLOR = {
     'icon': '#CD853F'    # 图标色
 }
 
-if show_constructions:
+def build_construction_layer():
+    fg = folium.FeatureGroup(name="constructions")
     construction_filter = construction_gdf[
         construction_gdf['Planned_Construction_Start'] <= pd.Timestamp(concert_date)
     ]
@@ -237,7 +274,7 @@ if show_constructions:
     for _, row in construction_filter.iterrows():
         # Add construction polygon
         folium.GeoJson(
-            row['Geometry'],
+            quantize(row['Geometry']),
             style_function=lambda x: {
                 'fillColor': '#8B4513',
                 'color': '#654321',
@@ -245,11 +282,11 @@ if show_constructions:
                 'fillOpacity': 0.4
             },
             tooltip=f"Project: {row['Project_Abbreviation']}"
-        ).add_to(m)
+        ).add_to(fg)
         
         # Add center marker
         folium.Marker(
-            location=[row['center'].y, row['center'].x],
+            location=[round(row['center'].y, COORD_PRECISION), round(row['center'].x, COORD_PRECISION)],
             icon=folium.Icon(
                 color='lightgray' if time_mode == 'night' else 'white',
                 icon_color='#654321',
@@ -258,14 +295,63 @@ if show_constructions:
             ),
             popup=f"<b>{row['Project_Abbreviation']}</b><br>"
                   f"Start Date: {row['Planned_Construction_Start'].strftime('%Y-%m-%d')}"
-        ).add_to(m)
+        ).add_to(fg)
+    return fg
 
-# Map rendering (simplified version)
-st_folium(
-    m,
+def build_timeline_layer(kinds):
+    # Slider plus construction/concert features, stepped through in the browser
+    fg = folium.FeatureGroup(name="timeline")
+    TimelineLayer(load_timeline(*timeline_range, kinds)).add_to(fg)
+    return fg
+
+# Overlay layers keyed by everything that affects their content. A layer is
+# rendered once when its id first appears and dropped when it leaves the
+# selection; live_map only sends the browser layers it has not sent yet.
+layer_builders = {}
+for (source_type, level), layer_gdf in noise_filter.groupby(['source_type', 'legend']):
+    layer_id = ('noise', per_feature_tooltips, source_type, time_mode, int(level))
+    if per_feature_tooltips:
+        layer_builders[layer_id] = lambda layer_gdf=layer_gdf, level=level: build_noise_layer(layer_gdf, level)
+    else:
+        layer_builders[layer_id] = lambda layer_gdf=layer_gdf, source_type=source_type, level=level: build_noise_topology_layer(layer_gdf, source_type, level)
+if show_concerts and not timeline_mode:
+    layer_builders[('concerts', concert_date)] = build_concert_layer
+if show_constructions and not timeline_mode:
+    layer_builders[('constructions', concert_date, time_mode)] = build_construction_layer
+if timeline_mode:
+    timeline_kinds = tuple(
+        kind for kind, shown in [('construction', show_constructions), ('concerts', show_concerts)] if shown
+    )
+    if timeline_kinds:
+        layer_builders[('timeline', *timeline_range, timeline_kinds)] = lambda: build_timeline_layer(timeline_kinds)
+
+if 'map_layers' not in st.session_state:
+    st.session_state.map_layers = {}
+map_layers = st.session_state.map_layers
+wanted_ids = [repr(layer_id) for layer_id in layer_builders]
+for layer_id in set(map_layers) - set(wanted_ids):
+    del map_layers[layer_id]
+for layer_id, build_layer in zip(wanted_ids, layer_builders.values()):
+    if layer_id not in map_layers:
+        map_layers[layer_id] = layer_payload(build_layer())
+
+# Map rendering: the map is mounted once per session, so pan/zoom stay client-side
+live_map(
+    {layer_id: map_layers[layer_id] for layer_id in wanted_ids},
     key="main_map",
-    width=1920,
-    height=600,
-    use_container_width=True,
-    returned_objects=[],  # Don't return any map parameters
-)
\ No newline at end of file
+    center=(52.3676, 4.9041),
+    zoom=12,
+    height=600
+)
+
+# Neighbourhood exposure of planned construction, served from the precomputed rollups
+if show_rollups:
+    rollup = load_rollups(load_dissolved_noise_data())[rollup_level]
+    rollup = rollup[
+        (rollup['source_type'].isin(noise_sources)) &
+        (rollup['period'] == time_mode)
+    ].rename(columns={
+        f'share_{band}': NOISE_LEVEL_MAPPING[band if time_mode == "day" else band + 10]
+        for band in range(1, 7)
+    })
+    st.dataframe(rollup.drop(columns=['period', 'project_area']), use_container_width=True, hide_index=True)
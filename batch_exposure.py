@@ -0,0 +1,153 @@
+"""Batch noise exposure report for a CSV of coordinates.
+
+For every input row this attaches the worst day and night noise level, the
+level per noise source and period, and the planned construction projects
+(started by --date) within --radius metres. The input is streamed in chunks,
+each chunk is matched against STRtree indexes in a worker pool, and results
+are appended to the output in input order. Only a few chunks per worker are
+read ahead, so memory stays bounded for inputs of any size.
+
+Example:
+    python batch_exposure.py data/raw/amsterdam_concerts.csv exposure.csv --radius 250
+"""
+import argparse
+import os
+from collections import deque
+from datetime import datetime
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import STRtree
+
+from loaders import NOISE_MAP_PATH, read_noise_map, read_raw_construction_plan
+
+PERIODS = ['day', 'night']
+
+# Per-worker state, filled once by _init_worker
+_noise = None
+_noise_tree = None
+_projects = None
+_project_tree = None
+_radius = None
+
+
+def level_column(period, source_type):
+    return f"{period}_{source_type.lower().replace(' ', '_')}"
+
+
+def output_columns(source_types):
+    columns = [f'{period}_worst' for period in PERIODS]
+    columns += [level_column(period, source_type) for period in PERIODS for source_type in source_types]
+    return columns + ['construction_count', 'construction_projects']
+
+
+def _init_worker(noise_path, as_of, radius):
+    global _noise, _noise_tree, _projects, _project_tree, _radius
+    # Individual polygons index better than the dissolved multipolygons
+    _noise = read_noise_map(noise_path).to_crs(epsg=28992)
+    _noise_tree = STRtree(_noise.geometry.values)
+
+    projects = read_raw_construction_plan()
+    _projects = projects[projects['Startbouwgepland'] <= pd.Timestamp(as_of)].reset_index(drop=True)
+    _project_tree = STRtree(_projects.geometry.values)
+    _radius = radius
+
+
+def exposure_for_points(points):
+    """Exposure columns for a GeoSeries of points in EPSG:28992, aligned to its index."""
+    result = pd.DataFrame(index=points.index)
+    positions = np.flatnonzero(~points.is_empty & points.notna())
+    valid = points.values[positions]
+
+    point_idx, noise_idx = _noise_tree.query(valid, predicate='intersects')
+    hits = pd.DataFrame({
+        'row': points.index[positions[point_idx]],
+        'source_type': _noise['source_type'].values[noise_idx],
+        'period': _noise['period'].values[noise_idx],
+        'legend': _noise['legend'].values[noise_idx]
+    })
+    levels = hits.groupby(['row', 'period', 'source_type'])['legend'].max()
+    for (period, source_type), level in levels.groupby(level=['period', 'source_type']):
+        result[level_column(period, source_type)] = level.droplevel(['period', 'source_type'])
+    for period, level in hits.groupby(['row', 'period'])['legend'].max().groupby(level='period'):
+        result[f'{period}_worst'] = level.droplevel('period')
+
+    point_idx, project_idx = _project_tree.query(valid, predicate='dwithin', distance=_radius)
+    nearby = pd.DataFrame({
+        'row': points.index[positions[point_idx]],
+        'project': _projects['Projectnaamafkorting'].values[project_idx]
+    }).groupby('row')['project']
+    result['construction_count'] = nearby.size()
+    result['construction_count'] = result['construction_count'].fillna(0).astype(int)
+    result['construction_projects'] = nearby.agg('; '.join)
+    return result
+
+
+def process_chunk(args):
+    chunk, lat_col, lon_col = args
+    coords = chunk[[lat_col, lon_col]].apply(pd.to_numeric, errors='coerce')
+    points = gpd.GeoSeries(
+        gpd.points_from_xy(coords[lon_col], coords[lat_col]),
+        index=chunk.index,
+        crs="EPSG:4326"
+    ).to_crs(epsg=28992)
+    points[coords.isna().any(axis=1)] = None
+    return chunk.join(exposure_for_points(points))
+
+
+def run_batch(input_path, output_path, lat_col='Latitude', lon_col='Longitude', radius=100,
+              as_of=None, chunksize=10000, workers=None, noise_path=NOISE_MAP_PATH):
+    as_of = as_of or datetime.today().date()
+    source_types = sorted(read_noise_map(noise_path)['source_type'].unique())
+    columns = output_columns(source_types)
+
+    chunks = pd.read_csv(input_path, chunksize=chunksize)
+    tasks = ((chunk, lat_col, lon_col) for chunk in chunks)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    rows = 0
+
+    def write(result):
+        nonlocal rows
+        # Same columns for every chunk, even if a source never matched in it
+        result = result.reindex(columns=[c for c in result.columns if c not in columns] + columns)
+        result[columns[:-2]] = result[columns[:-2]].astype('Int64')
+        result.to_csv(output_path, mode='a', header=rows == 0, index=False)
+        rows += len(result)
+        print(f"{rows} rows written", flush=True)
+
+    # Pool.imap would read the whole input ahead; keep at most `window` chunks in flight
+    window = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    with Pool(workers, initializer=_init_worker, initargs=(noise_path, as_of, radius)) as pool:
+        for task in tasks:
+            pending.append(pool.apply_async(process_chunk, (task,)))
+            if len(pending) >= window:
+                write(pending.popleft().get())
+        while pending:
+            write(pending.popleft().get())
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attach noise exposure to a CSV of coordinates.")
+    parser.add_argument('input', help="CSV with latitude/longitude columns (WGS84)")
+    parser.add_argument('output', help="CSV to write, input columns plus exposure columns")
+    parser.add_argument('--lat-col', default='Latitude')
+    parser.add_argument('--lon-col', default='Longitude')
+    parser.add_argument('--radius', type=float, default=100, help="Construction search radius in metres")
+    parser.add_argument('--date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=None,
+                        help="Count construction started on or before this date (default: today)")
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--noise-map', default=NOISE_MAP_PATH)
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, lat_col=args.lat_col, lon_col=args.lon_col, radius=args.radius,
+              as_of=args.date, chunksize=args.chunksize, workers=args.workers, noise_path=args.noise_map)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Dissolved noise zones: one multipolygon per (source_type, period, legend).
+
+noise_map.csv holds many adjacent or overlapping polygons per band; rendering
+each one separately draws shared edges twice and sends far more layers than
+needed. The dissolved layers are written next to noise_map.csv in the same
+format, so read_noise_map() loads them unchanged.
+
+Run `python dissolve.py` to rebuild the dissolved layers outside the app.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from loaders import NOISE_MAP_PATH, read_noise_map
+
+DISSOLVED_PATH = 'data/cleaned/noise_map_dissolved.csv'
+BAND_KEYS = ['source_type', 'period', 'legend']
+
+# Sources large enough that the union is split across worker processes
+PARALLEL_SOURCES = {'Road Traffic'}
+CHUNK_SIZE = 500
+
+
+def _union_chunk(geoms):
+    return shapely.union_all(geoms)
+
+
+def parallel_union(geoms, workers=None, chunk_size=CHUNK_SIZE):
+    """Cascaded union: union spatially sorted chunks in parallel, then union the partial results."""
+    geoms = gpd.GeoSeries(geoms).reset_index(drop=True)
+    if len(geoms) <= chunk_size:
+        return shapely.union_all(geoms.values)
+
+    # Hilbert order keeps each chunk spatially compact, so partial unions stay small
+    geoms = geoms.iloc[geoms.hilbert_distance().argsort()]
+    chunks = [geoms.values[i:i + chunk_size] for i in range(0, len(geoms), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(_union_chunk, chunks))
+    return shapely.union_all(partials)
+
+
+def dissolve_noise(noise_gdf, workers=None):
+    rows = []
+    for (source_type, period, legend), group in noise_gdf.groupby(BAND_KEYS):
+        geoms = group.geometry.make_valid()
+        if source_type in PARALLEL_SOURCES:
+            geometry = parallel_union(geoms, workers=workers)
+        else:
+            geometry = shapely.union_all(geoms.values)
+        rows.append({
+            'source_type': source_type,
+            'period': period,
+            'legend': legend,
+            'feature_count': len(group),
+            'geometry': geometry
+        })
+    return gpd.GeoDataFrame(rows, geometry='geometry', crs=noise_gdf.crs)
+
+
+def write_dissolved(dissolved_gdf, path=DISSOLVED_PATH):
+    # Same column names as noise_map.csv so read_noise_map() can load it
+    out_df = pd.DataFrame({
+        'Type': dissolved_gdf['source_type'],
+        'Day/Night period': dissolved_gdf['period'],
+        'legend': dissolved_gdf['legend'],
+        'feature_count': dissolved_gdf['feature_count'],
+        'WKT_LNG_LAT': dissolved_gdf.geometry.to_wkt()
+    })
+    out_df.to_csv(path, index=False)
+
+
+def refresh_dissolved(noise_path=NOISE_MAP_PATH, out_path=DISSOLVED_PATH, workers=None):
+    """Load the dissolved layers, rebuilding them only when noise_map.csv is newer."""
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(noise_path):
+        write_dissolved(dissolve_noise(read_noise_map(noise_path), workers=workers), out_path)
+    return read_noise_map(out_path)
+
+
+if __name__ == '__main__':
+    noise_gdf = read_noise_map()
+    dissolved_gdf = dissolve_noise(noise_gdf)
+    write_dissolved(dissolved_gdf)
+    print(f"{len(noise_gdf)} polygons -> {len(dissolved_gdf)} dissolved layers in {DISSOLVED_PATH}")
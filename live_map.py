@@ -0,0 +1,90 @@
+"""Map component that keeps overlay layers by id in the browser.
+
+st_folium re-sends every feature group on every rerun. live_map() instead
+mounts one Leaflet map per session and, on each rerun, sends only the ids of
+the current layers plus the rendered script of layers it has not sent yet. The
+browser drops layers whose id disappeared. Sent layers count as delivered, so a
+filter change costs one rerun; the browser only reports the ids it holds when it
+is asked for a layer it never received (e.g. after a remount), and the missing
+layers are sent again. Pan and zoom stay client-side because the map itself is
+never rebuilt.
+"""
+import os
+import folium
+import streamlit as st
+import streamlit.components.v1 as components
+
+_component = components.declare_component(
+    'live_map',
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live_map_frontend')
+)
+
+CARTODB_POSITRON = {
+    'url': 'https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png',
+    'attribution': '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> '
+                   'contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
+}
+
+
+def _resources(element, attr):
+    # (name, url) of the JS or CSS an element and its children pull into the page header
+    pairs = list(getattr(element, attr, []))
+    for child in element._children.values():
+        pairs += _resources(child, attr)
+    return pairs
+
+
+def layer_payload(layer):
+    """Render a folium FeatureGroup into the script the browser evaluates to add it."""
+    m = folium.Map(tiles=None)
+    layer.add_to(m)
+    root = m.get_root()
+    root.render()
+
+    map_name = m.get_name()
+    js, css = _resources(layer, 'default_js'), _resources(layer, 'default_css')
+    skip = {name for name, _ in _resources(m, 'default_js') + _resources(m, 'default_css')}
+    skip |= {'meta_http', map_name}
+    return {
+        'name': layer.get_name(),
+        'script': '\n'.join(
+            element.render() for name, element in root.script._children.items() if name != map_name
+        ).replace(map_name, 'map'),
+        # Extra <style> blocks, e.g. from GeoJsonTooltip
+        'header': '\n'.join(
+            element.render() for name, element in root.header._children.items() if name not in skip
+        ),
+        'js': list(dict.fromkeys(url for _, url in js)),
+        'css': list(dict.fromkeys(url for _, url in css))
+    }
+
+
+def live_map(layers, key, center=(52.3676, 4.9041), zoom=12, tiles=CARTODB_POSITRON, height=600):
+    """Show the map with `layers`, an ordered {layer_id: layer_payload(...)} dict.
+
+    Payloads are only sent for ids not sent before, unless the browser reported
+    that it lost them.
+    """
+    sent = st.session_state.setdefault(f'{key}_sent', {'ids': set(), 'report': None})
+    report = st.session_state.get(key)
+    if report and report['report'] != sent['report']:
+        # New report from the browser: resend whatever it does not hold
+        sent['ids'] = set(report['ids'])
+        sent['report'] = report['report']
+
+    payloads = {layer_id: payload for layer_id, payload in layers.items() if layer_id not in sent['ids']}
+    # The browser drops every layer that is not in `layers`
+    sent['ids'] = set(layers)
+    base = folium.Map(tiles=None)
+    return _component(
+        key=key,
+        default=None,
+        order=list(layers),
+        payloads=payloads,
+        js=[src for _, src in base.default_js],
+        css=[href for _, href in base.default_css],
+        center=list(center),
+        zoom=zoom,
+        tiles=tiles,
+        height=height
+    )
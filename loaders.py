@@ -0,0 +1,80 @@
+import glob
+import pandas as pd
+import geopandas as gpd
+from shapely import wkt
+
+NOISE_MAP_PATH = 'data/cleaned/noise_map.csv'
+CONCERT_PLAN_PATH = 'data/cleaned/concert_plan.csv'
+CONSTRUCTION_PLAN_PATH = 'data/cleaned/construction_plan.csv'
+RAW_CONSTRUCTION_GLOB = 'data/raw/nieuwbouwplannen-*.csv'
+
+# Administrative columns of the raw nieuwbouwplannen export that the cleaned file drops
+RAW_CONSTRUCTION_COLUMNS = [
+    'Id', 'Projectnaamafkorting', 'Buurtcode', 'Buurtnaam', 'Wijkcode', 'Wijknaam',
+    'Stadsdeelcode', 'Stadsdeelnaam', 'Startbouwgepland', 'Totaal', 'Geometrie'
+]
+
+
+def read_noise_map(path=NOISE_MAP_PATH):
+    noise_df = pd.read_csv(path)
+    noise_df = noise_df.rename(columns={
+        'Day/Night period': 'period',
+        'Type': 'source_type'
+    })
+    noise_df['period'] = noise_df['period'].str.lower()
+    noise_df['geometry'] = noise_df['WKT_LNG_LAT'].apply(wkt.loads)
+    return gpd.GeoDataFrame(noise_df, geometry='geometry').set_crs(epsg=4326)
+
+
+def read_concert_plan(path=CONCERT_PLAN_PATH):
+    try:
+        concert_df = pd.read_csv(path, encoding='utf-8')
+    except UnicodeDecodeError:
+        concert_df = pd.read_csv(path, encoding='latin1')
+    concert_df.replace('Unknown', pd.NA, inplace=True)
+    concert_df['Date'] = pd.to_datetime(concert_df['Date'])
+    concert_df[['Latitude', 'Longitude']] = concert_df[['Latitude', 'Longitude']].apply(pd.to_numeric, errors='coerce')
+    return concert_df.dropna(subset=['Latitude', 'Longitude'])
+
+
+def read_construction_plan(path=CONSTRUCTION_PLAN_PATH):
+    # Load data with proper coordinate system handling
+    construction_df = pd.read_csv(path)
+
+    # Convert WKT to geometry with original CRS
+    construction_df['Geometry'] = construction_df['Geometry'].apply(wkt.loads)
+    construction_gdf = gpd.GeoDataFrame(
+        construction_df,
+        geometry='Geometry',
+        crs="EPSG:28992"  # Set original CRS first
+    )
+
+    # Transform to WGS84 (EPSG:4326)
+    construction_gdf = construction_gdf.to_crs(epsg=4326)
+
+    # Calculate centroids AFTER transformation
+    construction_gdf['center'] = construction_gdf['Geometry'].centroid
+
+    # Parse dates
+    construction_gdf['Planned_Construction_Start'] = pd.to_datetime(
+        construction_gdf['Planned_Construction_Start']
+    )
+
+    return construction_gdf
+
+
+def read_raw_construction_plan(path=None):
+    """Raw nieuwbouwplannen export with buurt/wijk/stadsdeel columns, kept in EPSG:28992."""
+    if path is None:
+        path = sorted(glob.glob(RAW_CONSTRUCTION_GLOB))[-1]
+    raw_df = pd.read_csv(path, usecols=RAW_CONSTRUCTION_COLUMNS)
+    raw_df = raw_df.dropna(subset=['Geometrie'])
+
+    # Geometrie is EWKT ("SRID=28992;MULTIPOLYGON ..."), strip the SRID prefix
+    raw_df['geometry'] = raw_df.pop('Geometrie').str.split(';', n=1).str[-1].apply(wkt.loads)
+    raw_df['Startbouwgepland'] = pd.to_datetime(raw_df['Startbouwgepland'], errors='coerce')
+    raw_df['Totaal'] = pd.to_numeric(raw_df['Totaal'], errors='coerce').fillna(0).astype(int)
+    for col in ['Buurtcode', 'Buurtnaam', 'Wijkcode', 'Wijknaam', 'Stadsdeelcode', 'Stadsdeelnaam']:
+        raw_df[col] = raw_df[col].fillna('Unknown')
+
+    return gpd.GeoDataFrame(raw_df, geometry='geometry', crs="EPSG:28992")
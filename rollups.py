@@ -0,0 +1,188 @@
+"""Neighbourhood-level noise exposure rollups for planned construction.
+
+Per buurt, wijk and stadsdeel: the share of planned construction area that falls
+in each noise band (per source and period), and the number of projects / homes
+(`Totaal`) that touch a loud zone. Rollups are materialized to ROLLUP_DIR once and
+refreshed incrementally: only projects whose geometry is new or changed get
+re-overlaid, unless the noise map itself changed.
+
+Run `python rollups.py` to (re)build the rollups outside the app.
+"""
+import hashlib
+import json
+import os
+import pandas as pd
+import geopandas as gpd
+
+from dissolve import BAND_KEYS, refresh_dissolved
+from loaders import read_raw_construction_plan
+
+ROLLUP_DIR = 'data/cleaned/rollups'
+EXPOSURE_FILE = 'project_exposure.csv'
+MANIFEST_FILE = 'manifest.json'
+# Bump when project_exposure() changes, so stored exposure is recomputed
+EXPOSURE_VERSION = 2
+
+ROLLUP_LEVELS = {
+    'buurt': ['Buurtcode', 'Buurtnaam'],
+    'wijk': ['Wijkcode', 'Wijknaam'],
+    'stadsdeel': ['Stadsdeelnaam'],
+}
+
+# Band = legend % 10, so day 3-6 and night 13-16 ("Loud" and worse) count as loud
+LOUD_BAND = 3
+
+
+def noise_fingerprint(noise_gdf):
+    digest = hashlib.md5(pd.util.hash_pandas_object(noise_gdf[BAND_KEYS], index=False).values)
+    for wkb in noise_gdf.geometry.to_wkb():
+        digest.update(wkb)
+    return digest.hexdigest()
+
+
+def project_fingerprints(projects_gdf):
+    return {
+        str(project_id): hashlib.md5(geom.wkb).hexdigest()
+        for project_id, geom in zip(projects_gdf['Id'], projects_gdf.geometry)
+    }
+
+
+def _empty_exposure(id_dtype):
+    return pd.DataFrame({
+        'Id': pd.Series(dtype=id_dtype),
+        'source_type': pd.Series(dtype=object),
+        'period': pd.Series(dtype=object),
+        'legend': pd.Series(dtype=int),
+        'band_area': pd.Series(dtype=float)
+    })
+
+
+def project_exposure(projects_gdf, dissolved_gdf):
+    """Area (m²) of each project inside each (source_type, period, legend) band.
+
+    dissolved_gdf holds one geometry per band (see dissolve.py), so overlapping
+    zones of one band are not counted twice. Bands of one source and period can
+    still overlap each other; there the area counts towards the loudest band only,
+    so a project's shares per source and period add up to at most 1.
+    """
+    if projects_gdf.empty:
+        return _empty_exposure(projects_gdf['Id'].dtype)
+
+    bands = dissolved_gdf[BAND_KEYS + ['geometry']].to_crs(projects_gdf.crs)
+
+    pieces = gpd.overlay(projects_gdf[['Id', 'geometry']], bands, how='intersection', keep_geom_type=True)
+    pieces = pieces.sort_values('legend', ascending=False, kind='stable')
+
+    # Loudest band first: cut away what a louder band of the same project, source
+    # and period already covers
+    covered = {}
+    geoms = []
+    for key, geom in zip(zip(pieces['Id'], pieces['source_type'], pieces['period']), pieces.geometry):
+        louder = covered.get(key)
+        geoms.append(geom if louder is None else geom.difference(louder))
+        covered[key] = geom if louder is None else louder.union(geom)
+    pieces['band_area'] = gpd.GeoSeries(geoms, index=pieces.index, crs=pieces.crs).area
+    pieces = pieces[pieces['band_area'] > 0].sort_index()
+    return pd.DataFrame(pieces.drop(columns='geometry'))[['Id'] + BAND_KEYS + ['band_area']]
+
+
+def aggregate_level(projects_gdf, exposure_df, level, source_periods):
+    """One row per (area, source_type, period) with band shares and loud-zone totals.
+
+    source_periods holds every (source_type, period) pair of the noise map, so areas
+    without any overlap for a pair are still reported, with zero shares.
+    """
+    keys = ROLLUP_LEVELS[level]
+    projects = pd.DataFrame(projects_gdf.drop(columns='geometry'))
+    projects['project_area'] = projects_gdf.area
+
+    totals = projects.groupby(keys).agg(
+        project_area=('project_area', 'sum'),
+        projects=('Id', 'count'),
+        housing=('Totaal', 'sum')
+    ).reset_index()
+
+    exposure = exposure_df.merge(projects[['Id', 'Totaal'] + keys], on='Id')
+    exposure['band'] = exposure['legend'] % 10
+
+    shares = exposure.groupby(keys + ['source_type', 'period', 'band'])['band_area'].sum().unstack('band', fill_value=0)
+    shares.columns = [f'share_{band}' for band in shares.columns]
+    shares = shares.reset_index()
+
+    loud = exposure[exposure['band'] >= LOUD_BAND].drop_duplicates(subset=['Id', 'source_type', 'period'])
+    loud = loud.groupby(keys + ['source_type', 'period']).agg(
+        loud_projects=('Id', 'count'),
+        loud_housing=('Totaal', 'sum')
+    ).reset_index()
+
+    grid = totals.merge(source_periods[['source_type', 'period']].drop_duplicates(), how='cross')
+    rollup = grid.merge(shares, on=keys + ['source_type', 'period'], how='left')
+    rollup = rollup.merge(loud, on=keys + ['source_type', 'period'], how='left')
+    share_cols = [col for col in rollup.columns if col.startswith('share_')]
+    rollup[share_cols] = rollup[share_cols].fillna(0).div(rollup['project_area'], axis=0).round(4)
+    rollup[['loud_projects', 'loud_housing']] = rollup[['loud_projects', 'loud_housing']].fillna(0).astype(int)
+    return rollup.sort_values(keys + ['source_type', 'period']).reset_index(drop=True)
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'version': None, 'noise': None, 'projects': {}}
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != EXPOSURE_VERSION:
+        # Computed differently: keep nothing
+        return {'version': None, 'noise': None, 'projects': {}}
+    return manifest
+
+
+def refresh_rollups(dissolved_gdf, projects_gdf, out_dir=ROLLUP_DIR):
+    """Bring the materialized rollups up to date and return them as {level: DataFrame}.
+
+    dissolved_gdf is the dissolved noise map as returned by refresh_dissolved().
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+    exposure_path = os.path.join(out_dir, EXPOSURE_FILE)
+
+    current_noise = noise_fingerprint(dissolved_gdf)
+    current_projects = project_fingerprints(projects_gdf)
+    level_paths = {level: os.path.join(out_dir, f'{level}.csv') for level in ROLLUP_LEVELS}
+
+    # Nothing changed since the last refresh: serve the stored rollups as they are
+    if (manifest['noise'] == current_noise and manifest['projects'] == current_projects
+            and all(os.path.exists(path) for path in level_paths.values())):
+        return {level: pd.read_csv(path) for level, path in level_paths.items()}
+
+    if manifest['noise'] == current_noise and os.path.exists(exposure_path):
+        cached = pd.read_csv(exposure_path)
+        unchanged = {pid for pid, fp in current_projects.items() if manifest['projects'].get(pid) == fp}
+    else:
+        cached = _empty_exposure(projects_gdf['Id'].dtype)
+        unchanged = set()
+
+    stale = projects_gdf['Id'].astype(str).map(lambda pid: pid not in unchanged)
+    cached = cached[cached['Id'].astype(str).isin(unchanged)]
+    fresh = project_exposure(projects_gdf[stale], dissolved_gdf)
+    exposure = pd.concat([cached, fresh], ignore_index=True) if len(fresh) else cached
+    exposure = exposure.astype({'Id': projects_gdf['Id'].dtype, 'legend': int})
+
+    rollups = {
+        level: aggregate_level(projects_gdf, exposure, level, dissolved_gdf[['source_type', 'period']])
+        for level in ROLLUP_LEVELS
+    }
+
+    for level, rollup in rollups.items():
+        rollup.to_csv(level_paths[level], index=False)
+    exposure.to_csv(exposure_path, index=False)
+    # Written last, so an interrupted refresh is redone on the next call
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': EXPOSURE_VERSION, 'noise': current_noise, 'projects': current_projects}, f)
+
+    return rollups
+
+
+if __name__ == '__main__':
+    results = refresh_rollups(refresh_dissolved(), read_raw_construction_plan())
+    for level, rollup in results.items():
+        print(f"{level}: {len(rollup)} rows -> {os.path.join(ROLLUP_DIR, level + '.csv')}")
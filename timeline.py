@@ -0,0 +1,181 @@
+"""Timeline mode: construction and concert activity over a date range.
+
+Activity is precomputed once per range as per-day delta lists (what starts and
+what ends on each day). TimelineLayer ships those deltas with the features, and
+stepping through days on the client applies only the additions and removals
+between the previous and the current day instead of rerunning the script.
+"""
+from collections import defaultdict
+import pandas as pd
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import TimestampedGeoJson
+from jinja2 import Template
+from shapely.geometry import mapping
+
+from transport import COORD_PRECISION, quantize
+
+CONCERT_COLOR = '#9C27B0'
+CONSTRUCTION_STYLE = {
+    'fillColor': '#8B4513',
+    'color': '#654321',
+    'weight': 1.5,
+    'fillOpacity': 0.4
+}
+
+
+def activity_deltas(construction_gdf, concert_df, start_date, end_date):
+    """Per-day changes in the active sets between start_date and end_date (inclusive).
+
+    Returns {day: {'construction': (added, removed), 'concerts': (added, removed)}}
+    with index labels of construction_gdf / concert_df. Days without changes are omitted.
+    Construction projects stay active once started; concerts are active on their date only.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    deltas = defaultdict(lambda: {'construction': ([], []), 'concerts': ([], [])})
+
+    starts = construction_gdf['Planned_Construction_Start'].dt.normalize()
+    for idx, day in starts[starts <= end].items():
+        # Projects started before the range are already active on its first day
+        deltas[max(day, start)]['construction'][0].append(idx)
+
+    dates = concert_df['Date'].dt.normalize()
+    for idx, day in dates[(dates >= start) & (dates <= end)].items():
+        deltas[day]['concerts'][0].append(idx)
+        if day < end:
+            deltas[day + pd.Timedelta(days=1)]['concerts'][1].append(idx)
+
+    return dict(sorted(deltas.items()))
+
+
+def _construction_feature(row):
+    return {
+        'type': 'Feature',
+        'geometry': mapping(quantize(row['Geometry'])),
+        'properties': {
+            'style': CONSTRUCTION_STYLE,
+            'popup': f"<b>{row['Project_Abbreviation']}</b><br>"
+                     f"Start Date: {row['Planned_Construction_Start'].strftime('%Y-%m-%d')}"
+        }
+    }
+
+
+def _concert_feature(event):
+    return {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [round(event['Longitude'], COORD_PRECISION), round(event['Latitude'], COORD_PRECISION)]
+        },
+        'properties': {
+            'style': {
+                'color': CONCERT_COLOR,
+                'fillColor': CONCERT_COLOR,
+                'fillOpacity': 0.6,
+                'radius': 7
+            },
+            'popup': f"<b>{event['Artist']}</b><br>"
+                     f"{event['Venue']}<br>"
+                     f"{event['Date'].strftime('%Y-%m-%d')}"
+        }
+    }
+
+
+def timeline_payload(construction_gdf, concert_df, deltas, start_date, end_date,
+                     kinds=('construction', 'concerts')):
+    """Features plus per-day [added, removed] feature positions for TimelineLayer."""
+    days = pd.date_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq='D')
+    build = {
+        'construction': lambda idx: _construction_feature(construction_gdf.loc[idx]),
+        'concerts': lambda idx: _concert_feature(concert_df.loc[idx])
+    }
+
+    features = []
+    positions = {}
+    day_deltas = [[[], []] for _ in days]
+    for day, changes in deltas.items():
+        added, removed = day_deltas[days.get_loc(day)]
+        for kind in kinds:
+            for idx in changes[kind][0]:
+                positions[(kind, idx)] = len(features)
+                features.append(build[kind](idx))
+                added.append(positions[(kind, idx)])
+            removed.extend(positions[(kind, idx)] for idx in changes[kind][1])
+
+    return {
+        'days': [day.strftime('%Y-%m-%d') for day in days],
+        'deltas': day_deltas,
+        'features': {'type': 'FeatureCollection', 'features': features}
+    }
+
+
+class TimelineLayer(JSCSSMixin, MacroElement):
+    """Time slider that steps through a timeline_payload by applying its day deltas.
+
+    Can be added to the map or to a FeatureGroup; the slider control follows the
+    group on and off the map.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            (function() {
+                // Parent is the map or a feature group that is added to the map afterwards
+                var parent = {{ this._parent.get_name() }};
+                var payload = {{ this.payload|tojson }};
+                var times = payload.days.map(function(day) { return Date.parse(day); });
+
+                var layers = [];
+                L.geoJson(payload.features, {
+                    pointToLayer: function(feature, latLng) {
+                        return L.circleMarker(latLng, feature.properties.style);
+                    },
+                    style: function(feature) { return feature.properties.style; },
+                    onEachFeature: function(feature, layer) {
+                        if (feature.properties.popup) { layer.bindPopup(feature.properties.popup); }
+                        layers.push(layer);
+                    }
+                });
+                var visible = L.layerGroup().addTo(parent);
+
+                // Day index whose deltas have been applied; -1 means nothing shown yet
+                var position = -1;
+                function apply(index, forward) {
+                    var delta = payload.deltas[index];
+                    delta[forward ? 0 : 1].forEach(function(id) { visible.addLayer(layers[id]); });
+                    delta[forward ? 1 : 0].forEach(function(id) { visible.removeLayer(layers[id]); });
+                }
+                function seek(target) {
+                    while (position < target) { position += 1; apply(position, true); }
+                    while (position > target) { apply(position, false); position -= 1; }
+                }
+
+                var timeDimension = L.timeDimension({times: times, currentTime: times[0]});
+                timeDimension.on('timeload', function(event) {
+                    seek(times.indexOf(event.time));
+                });
+                var control = L.control.timeDimension({
+                    timeDimension: timeDimension,
+                    position: 'bottomleft',
+                    autoPlay: false,
+                    loopButton: false,
+                    timeSliderDragUpdate: true,
+                    timeZones: ['UTC'],
+                    playerOptions: {transitionTime: 500, loop: false}
+                });
+                if (parent instanceof L.Map) {
+                    parent.addControl(control);
+                } else {
+                    parent.on('add', function() { parent._map.addControl(control); });
+                    parent.on('remove', function() { control.remove(); });
+                }
+                seek(0);
+            })();
+        {% endmacro %}
+    """)
+
+    default_js = TimestampedGeoJson.default_js
+    default_css = TimestampedGeoJson.default_css
+
+    def __init__(self, payload):
+        super().__init__()
+        self._name = 'TimelineLayer'
+        self.payload = payload
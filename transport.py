@@ -0,0 +1,174 @@
+"""Compact geometry encoding for the map transport.
+
+Coordinates leave to_crs() with 15+ significant digits, far beyond what a web
+map can show. This module quantizes geometries before they are serialized and
+encodes noise layers as TopoJSON: coordinates become delta-encoded integers and
+the boundary shared by two adjacent zones is stored once as an arc instead of
+once per polygon. Compression on the wire is left to Streamlit's websocket
+(see .streamlit/config.toml).
+
+Run `python transport.py` to print the bytes per encoding for the current data.
+"""
+import gzip
+import json
+import numpy as np
+import shapely
+from shapely.geometry import mapping
+
+try:
+    import brotli
+except ImportError:  # optional, only used for the size report
+    brotli = None
+
+# 6 decimals of a degree is ~0.1 m, well below what a tile at zoom 18 resolves
+COORD_PRECISION = 6
+TOPO_QUANTIZATION = 10 ** 6
+
+
+def quantize(geom, precision=COORD_PRECISION):
+    """Round every coordinate of a shapely geometry to `precision` decimals."""
+    return shapely.transform(geom, lambda coords: np.round(coords, precision))
+
+
+def _polygon_rings(geom):
+    if geom.geom_type == 'Polygon':
+        return [[geom.exterior] + list(geom.interiors)]
+    if geom.geom_type in ('MultiPolygon', 'GeometryCollection'):
+        return [rings for part in geom.geoms for rings in _polygon_rings(part)]
+    return []
+
+
+def to_topojson(geometries, properties, object_name='noise', quantization=TOPO_QUANTIZATION):
+    """Encode (Multi)Polygons as a TopoJSON topology with shared, delta-encoded arcs.
+
+    geometries and properties are parallel sequences; each geometry becomes one
+    MultiPolygon object in objects[object_name] carrying its properties dict.
+    """
+    bounds = shapely.total_bounds(np.asarray(geometries, dtype=object))
+    x0, y0 = bounds[0], bounds[1]
+    kx = (bounds[2] - x0) / (quantization - 1) or 1
+    ky = (bounds[3] - y0) / (quantization - 1) or 1
+
+    # Quantize every ring to the integer grid and drop repeated points
+    shapes = []
+    for geom in geometries:
+        polygons = []
+        for rings in _polygon_rings(geom):
+            quantized = []
+            for ring in rings:
+                coords = np.asarray(ring.coords)
+                grid = np.column_stack([
+                    np.round((coords[:, 0] - x0) / kx),
+                    np.round((coords[:, 1] - y0) / ky)
+                ]).astype(np.int64)
+                keep = np.ones(len(grid), dtype=bool)
+                keep[1:] = np.any(grid[1:] != grid[:-1], axis=1)
+                points = [tuple(p) for p in grid[keep].tolist()]
+                if len(points) >= 4:
+                    quantized.append(points)
+            if quantized:
+                polygons.append(quantized)
+        shapes.append(polygons)
+
+    # A point is a junction when it is reached from different neighbours in different rings
+    neighbours = {}
+    junctions = set()
+    for polygons in shapes:
+        for rings in polygons:
+            for ring in rings:
+                n = len(ring) - 1
+                for i in range(n):
+                    pair = tuple(sorted((ring[i - 1 if i else n - 1], ring[i + 1])))
+                    seen = neighbours.setdefault(ring[i], pair)
+                    if seen != pair:
+                        junctions.add(ring[i])
+
+    arcs = []
+    arc_ids = {}
+
+    def arc_index(points):
+        key = tuple(points)
+        if key in arc_ids:
+            return arc_ids[key]
+        reverse = key[::-1]
+        if reverse in arc_ids:
+            return ~arc_ids[reverse]
+        arc_ids[key] = len(arcs)
+        arcs.append(points)
+        return arc_ids[key]
+
+    def ring_arcs(ring):
+        ring = ring[:-1]
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            # Closed ring without junctions: start at its smallest point so the same
+            # ring in another polygon (either direction) maps onto the same arc
+            start = ring.index(min(ring))
+            return [arc_index(ring[start:] + ring[:start] + [ring[start]])]
+        ring = ring[cuts[0]:] + ring[:cuts[0]] + [ring[cuts[0]]]
+        cuts = [i - cuts[0] for i in cuts] + [len(ring) - 1]
+        return [arc_index(ring[a:b + 1]) for a, b in zip(cuts[:-1], cuts[1:])]
+
+    objects = [
+        {
+            'type': 'MultiPolygon',
+            'arcs': [[ring_arcs(ring) for ring in rings] for rings in polygons],
+            'properties': props
+        }
+        for polygons, props in zip(shapes, properties)
+    ]
+
+    encoded = []
+    for points in arcs:
+        points = np.asarray(points, dtype=np.int64)
+        deltas = np.vstack([points[:1], np.diff(points, axis=0)])
+        encoded.append(deltas.tolist())
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [kx, ky], 'translate': [x0, y0]},
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': objects}},
+        'arcs': encoded
+    }
+
+
+def compressed_sizes(payload):
+    raw = payload.encode('utf-8')
+    sizes = {'raw': len(raw), 'gzip': len(gzip.compress(raw, compresslevel=6))}
+    if brotli is not None:
+        sizes['brotli'] = len(brotli.compress(raw))
+    return sizes
+
+
+def payload_report(gdf, properties_columns):
+    """Serialized size of a layer as plain GeoJSON, quantized GeoJSON and TopoJSON."""
+    props = gdf[properties_columns].to_dict('records')
+
+    def feature_collection(geoms):
+        return json.dumps({
+            'type': 'FeatureCollection',
+            'features': [
+                {'type': 'Feature', 'geometry': mapping(geom), 'properties': p}
+                for geom, p in zip(geoms, props)
+            ]
+        }, separators=(',', ':'))
+
+    return {
+        'geojson': compressed_sizes(feature_collection(gdf.geometry)),
+        'geojson_quantized': compressed_sizes(feature_collection(gdf.geometry.apply(quantize))),
+        'topojson': compressed_sizes(json.dumps(to_topojson(list(gdf.geometry), props), separators=(',', ':')))
+    }
+
+
+if __name__ == '__main__':
+    from dissolve import refresh_dissolved
+    from loaders import read_construction_plan
+
+    layers = {
+        'noise (dissolved)': (refresh_dissolved(), ['source_type', 'period', 'legend']),
+        'construction': (read_construction_plan().set_geometry('Geometry'), ['Project_Abbreviation'])
+    }
+    for name, (gdf, columns) in layers.items():
+        print(name)
+        for encoding, sizes in payload_report(gdf, columns).items():
+            print(f"  {encoding:<18}" + "  ".join(f"{k}={v:,}" for k, v in sizes.items()))
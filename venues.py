@@ -0,0 +1,86 @@
+"""Venue dimension for the concert plan.
+
+concert_plan.csv repeats the same venues across hundreds of rows. VenueIndex
+deduplicates them once at load time (one coordinate per venue) and keeps a
+sorted array of event dates per venue, so per-venue and per-area questions are
+answered with binary searches instead of scans over the concert frame.
+"""
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class VenueIndex:
+    def __init__(self, concert_df):
+        # Venues without a name are keyed by their coordinates
+        keys = concert_df['Venue'].astype('string').fillna(
+            concert_df['Latitude'].round(5).astype(str) + ',' + concert_df['Longitude'].round(5).astype(str)
+        )
+        self.venues = (
+            concert_df.assign(venue_key=keys)
+            .groupby('venue_key', sort=True)
+            .agg(Venue=('Venue', 'first'), Latitude=('Latitude', 'median'),
+                 Longitude=('Longitude', 'median'), events=('Date', 'size'))
+            .reset_index()
+        )
+        self.venues.index.name = 'venue_id'
+        venue_ids = pd.Series(self.venues.index, index=self.venues['venue_key'])
+
+        # Concert row -> venue_id, so callers can map any filtered frame onto venues
+        self.concert_venue = keys.map(venue_ids).rename('venue_id')
+
+        nights = concert_df['Date'].dt.normalize().values.astype('datetime64[D]')
+        order = np.lexsort((nights, self.concert_venue.values))
+        sorted_venues = self.concert_venue.values[order]
+        bounds = np.searchsorted(sorted_venues, np.arange(len(self.venues) + 1))
+        # Sorted event-date array per venue (one entry per concert)
+        self.event_dates = [nights[order][bounds[i]:bounds[i + 1]] for i in range(len(self.venues))]
+
+        # night -> {venue_id: concert row labels}, for grouping markers per venue per day
+        self._by_night = {}
+        for (night, venue_id), rows in pd.Series(concert_df.index.values).groupby([nights, self.concert_venue.values]):
+            self._by_night.setdefault(night, {})[venue_id] = rows.values
+
+    def venue_id(self, venue):
+        matches = self.venues.index[self.venues['Venue'] == venue]
+        if len(matches) == 0:
+            raise KeyError(f"Unknown venue: {venue}")
+        return matches[0]
+
+    def _date_range(self, venue_id, start, end):
+        dates = self.event_dates[venue_id]
+        lo, hi = np.searchsorted(dates, [np.datetime64(start, 'D'), np.datetime64(end, 'D')], side='left')
+        return slice(lo, hi)
+
+    def events_on(self, day):
+        """{venue_id: concert row labels} for the concerts on the given day."""
+        return self._by_night.get(pd.Timestamp(day).normalize(), {})
+
+    def event_nights(self, venue_id, start, days=30):
+        """Number of distinct nights with at least one concert in [start, start + days)."""
+        start = np.datetime64(pd.Timestamp(start).date(), 'D')
+        dates = self.event_dates[venue_id][self._date_range(venue_id, start, start + days)]
+        return len(np.unique(dates))
+
+    def venues_within(self, lat, lon, radius_m):
+        distances = haversine_m(lat, lon, self.venues['Latitude'].values, self.venues['Longitude'].values)
+        return self.venues.index[distances <= radius_m]
+
+    def busy_nights(self, lat, lon, radius_m=1000, min_concerts=2, start=None, end=None):
+        """Concert count per night within radius_m of a point, for nights with more than min_concerts."""
+        venue_ids = self.venues_within(lat, lon, radius_m)
+        if len(venue_ids) == 0:
+            return pd.Series(dtype=int, name='concerts')
+        start = np.datetime64('1970-01-01', 'D') if start is None else np.datetime64(pd.Timestamp(start).date(), 'D')
+        end = np.datetime64('9999-12-31', 'D') if end is None else np.datetime64(pd.Timestamp(end).date(), 'D')
+        dates = np.concatenate([self.event_dates[v][self._date_range(v, start, end)] for v in venue_ids])
+        nights, counts = np.unique(dates, return_counts=True)
+        busy = counts > min_concerts
+        return pd.Series(counts[busy], index=pd.DatetimeIndex(nights[busy], name='night'), name='concerts')